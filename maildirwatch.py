@@ -37,6 +37,12 @@ To list available options, run::
 
   maildirwatch --help
 
+The list of maildirs found at startup is cached in
+``$XDG_CACHE_HOME/maildirwatch/maildirs`` (``~/.cache/maildirwatch/maildirs``
+if ``XDG_CACHE_HOME`` is not defined).  The cache is used as long as none of
+the scanned directories were modified since, otherwise maildirs are searched
+again.
+
 Configuration
 =============
 
@@ -120,26 +126,27 @@ __version__ = '0.2.0'
 
 import argparse
 import configparser
-import email
+import ctypes
 import email.policy
-import hashlib
 import html
+import json
 import logging
 import os
+import re
 import signal
+import struct
 import sys
-from fnmatch import fnmatch
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.errors import HeaderParseError
+from email.header import Header, decode_header, make_header
+from email.parser import BytesParser
+from fnmatch import translate
 from functools import partial
 
-if True:  # pylint: disable=using-constant-test
-    # Keep this in an if block to keep isort from touching these lines.  isort
-    # reorders the statements and puts imports first, but we need the call to
-    # `require_version' before importing from gi.repository.
-    import gi
-    gi.require_version('Gtk', '3.0')
-    gi.require_version('Gio', '2.0')
-    gi.require_version('Notify', '0.7')
-    from gi.repository import GLib, Gtk, Gio, Notify
+# Modules from gi.repository, imported by `import_gi'.
+GLib = Gtk = Gio = Notify = None
 
 config = configparser.ConfigParser()
 config.add_section('global')
@@ -150,54 +157,310 @@ config['global']['maildir'] = '~/Maildir'
 
 logger = logging.getLogger(__name__)
 
+# File monitor events which indicate arrival of a new message, set in
+# `import_gi'.
+_HANDLED_EVENTS = frozenset()
+
+MAILDIR_SUBDIRS = frozenset(('new', 'cur', 'tmp'))
+
+# inotify(7) constants.
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Minimum time in seconds between restarts of the notification timer.
+TIMER_RESET_INTERVAL = 0.25
+
+# Number of bytes read at once from a message file until the end of its
+# headers.
+HEADER_READ_SIZE = 8192
+
+# Only headers of new messages are needed, so bodies are never parsed.  The
+# compat32 policy doesn't decode header values; this is done only for values
+# which are displayed, see `decode_header_value'.
+_PARSER = BytesParser(policy=email.policy.compat32)
+
+# Line breaks used to fold long header values, see RFC 5322 section 2.2.3.
+_FOLDING_RE = re.compile(r'\r?\n(?=[ \t])')
+
+# Characters with special meaning in fnmatch patterns.
+_GLOB_CHARS_RE = re.compile(r'[*?[]')
+
+# Set to False when the program is stopped by an unhandled exception.
+_success = True
+
+# Matchers for the `ignore' and `whitelist' options, set in `main'.
+_ignore_match = None
+_whitelist_match = None
+
+
+def import_gi():
+    """Import modules from gi.repository into the global namespace.
+
+    This is not done at import time, so that loading the introspection
+    machinery is avoided when it's not needed, e.g. for ``--help``.
+
+    """
+    global GLib, Gtk, Gio, Notify, _HANDLED_EVENTS
+
+    import gi
+    gi.require_version('Gtk', '3.0')
+    gi.require_version('Gio', '2.0')
+    gi.require_version('Notify', '0.7')
+    from gi.repository import GLib, Gtk, Gio, Notify
+
+    # Monitors are created without WATCH_MOVES, so messages moved into a
+    # directory are reported as CREATED too.
+    _HANDLED_EVENTS = frozenset((Gio.FileMonitorEvent.CREATED, ))
+
 
 def hash_message(message):
     """Return a unique identifier for parsed email message.
 
-    The identifier is used to compare messages for equality.
+    The identifier is used to compare messages for equality.  It is the
+    ``Message-Id`` header if present, otherwise a hashable tuple of other
+    header values.
 
     `message` should be a dict-like object with keys named after email
     headers (e.g. ``From`, ``Subject``).
 
     """
-    hasher = hashlib.sha1()
-    hasher.update(message.get('Date', '').encode())
-    hasher.update(message.get('From', '').encode())
-    hasher.update(message.get('Message-Id', '').encode())
-    hasher.update(message.get('Subject', '').encode())
-    hasher.update(message.get('To', '').encode())
-    return hasher.digest()
-
-
-def iter_maildirs(directory):
-    """Yield all maildirs in `directory`, recursively."""
-    # Check if DIRECTORY is a maildir.
-    newdir = os.path.join(directory, 'new')
-    tmpdir = os.path.join(directory, 'tmp')
-    curdir = os.path.join(directory, 'cur')
-    if all(map(os.path.exists, (newdir, tmpdir, curdir))):
-        yield directory
-
-    # Scan recursively.
-    for subdir in os.listdir(directory):
-        subdirpath = os.path.join(directory, subdir)
-        if os.path.isdir(subdirpath):
-            yield from iter_maildirs(subdirpath)
+    # Values can be `email.header.Header' objects, which are not hashable.
+    message_id = unfold_header_value(message.get('Message-Id', ''))
+    if message_id:
+        return message_id
+    return tuple(
+        unfold_header_value(message.get(name, ''))
+        for name in ('Date', 'From', 'Subject', 'To'))
 
 
-def maildir_is_ignored(directory):
-    """Check if `directory` is ignored in the config."""
-    is_ignored = any(
-        map(partial(fnmatch, directory),
-            config['global']['ignore'].split(',')))
+def iter_maildirs(directory, mtimes=None):
+    """Yield all maildirs in `directory`, recursively.
+
+    If `mtimes` is a dict, the modification times of all scanned directories
+    are stored in it.  Directories which couldn't be read and dangling
+    symlinks are stored with None.
+
+    """
+    pending = deque([directory])
+    # Identities of scanned directories, to avoid symlink loops.
+    visited = set()
+    while pending:
+        directory = pending.popleft()
+        try:
+            # Stat before reading the directory, so that changes made while
+            # scanning it invalidate the cache.
+            stat = os.stat(directory)
+            if (stat.st_dev, stat.st_ino) in visited:
+                logger.debug('Already scanned, skipping %s', directory)
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            if mtimes is not None:
+                mtimes[directory] = stat.st_mtime_ns
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except PermissionError:
+            logger.warning('Permission denied, not scanning %s', directory)
+            if mtimes is not None:
+                # Never matches a real mtime, so the cache is invalidated.
+                # Fixing permissions doesn't change the mtime.
+                mtimes[directory] = None
+            continue
+
+        names = {entry.name for entry in entries}
+        is_maildir = MAILDIR_SUBDIRS.issubset(names)
+        if is_maildir:
+            yield directory
+
+        # The `new', `cur' and `tmp' directories of a maildir contain only
+        # messages, but other subdirectories may still be maildirs
+        # (e.g. Maildir++ folders).  Symlinks to directories are followed.
+        pending.extend(
+            entry.path for entry in entries
+            if entry.is_dir()
+            and not (is_maildir and entry.name in MAILDIR_SUBDIRS))
+
+        if mtimes is not None:
+            # The target of a dangling symlink may appear later without
+            # changing any mtime, so such symlinks invalidate the cache.
+            for entry in entries:
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    mtimes[entry.path] = None
+
+
+def unfold_header_value(value):
+    """Return header `value` as a string with folding line breaks removed."""
+    return _FOLDING_RE.sub('', str(value))
+
+
+def decode_header_value(value):
+    """Return header `value` as a string, decoding RFC 2047 encoded words."""
+    if value is None:
+        return ''
+    if isinstance(value, Header):
+        # compat32 returns raw non-ASCII bytes (allowed by RFC 6532) as
+        # `unknown-8bit' chunks; they're almost always UTF-8.
+        value = ''.join(
+            chunk.decode('utf-8' if charset in (None, 'unknown-8bit') else
+                         charset, 'replace') if isinstance(chunk, bytes)
+            else chunk
+            for chunk, charset in decode_header(value))
+    value = unfold_header_value(value)
+    try:
+        return str(make_header(decode_header(value)))
+    except (HeaderParseError, LookupError, UnicodeError):
+        return str(value)
+
+
+def maildir_cache_path():
+    """Return path to the file with cached list of maildirs."""
+    return os.path.expanduser(
+        os.path.join(os.environ.get('XDG_CACHE_HOME', '~/.cache'),
+                     'maildirwatch', 'maildirs'))
+
+
+def load_maildir_cache(path, directory):
+    """Return cached list of maildirs in `directory`.
+
+    Return None if there is no valid cache in file at `path`, or if any of
+    the directories scanned when creating it was modified since.
+
+    """
+    try:
+        with open(path) as inputfile:
+            cache = json.load(inputfile)
+        if cache['directory'] != directory:
+            return None
+        for scanned, mtime in cache['mtimes'].items():
+            if os.stat(scanned).st_mtime_ns != mtime:
+                return None
+        return cache['maildirs']
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_maildir_cache(path, directory, maildirs, mtimes):
+    """Write list of `maildirs` in `directory` to file at `path`."""
+    cache = {'directory': directory, 'maildirs': maildirs, 'mtimes': mtimes}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as outputfile:
+            json.dump(cache, outputfile)
+        os.replace(path + '.tmp', path)
+    except OSError as exc:
+        logger.warning('Could not write maildir cache %s: %s', path, exc)
+
+
+def find_maildirs(directory):
+    """Return list of all maildirs in `directory`, using cache if possible."""
+    cache_path = maildir_cache_path()
+    maildirs = load_maildir_cache(cache_path, directory)
+    if maildirs is not None:
+        logger.debug('Using cached maildir list from %s', cache_path)
+        return maildirs
+
+    mtimes = {}
+    maildirs = list(iter_maildirs(directory, mtimes))
+    save_maildir_cache(cache_path, directory, maildirs, mtimes)
+    return maildirs
+
+
+def read_headers(path):
+    """Return the header block of message in file at `path` as bytes.
+
+    The file is read in chunks of `HEADER_READ_SIZE` bytes only until the end
+    of the header block, which usually takes a single read.
+
+    """
+    data = bytearray()
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        while True:
+            chunk = os.read(fd, HEADER_READ_SIZE)
+            if not chunk:
+                # Message without a body.
+                return bytes(data)
+
+            # The separator may start at the end of the previous chunk.
+            start = max(len(data) - 3, 0)
+            data += chunk
+            ends = [(data.find(separator, start), len(separator))
+                    for separator in (b'\r\n\r\n', b'\n\n')]
+            ends = [(end, length) for end, length in ends if end >= 0]
+            if ends:
+                end, length = min(ends)
+                # Keep the line break terminating the last header.
+                return bytes(data[:end + length // 2])
+    finally:
+        os.close(fd)
+
 
-    whitelist = config['global'].get('whitelist')
-    if whitelist:
-        is_ignored = is_ignored and not any(
-            map(partial(fnmatch, directory),
-                config['global']['whitelist'].split(',')))
+def parse_message_file(path):
+    """Parse headers of message in file at `path`.
 
-    return is_ignored
+    Return None if the file doesn't exist.
+
+    """
+    try:
+        return _PARSER.parsebytes(read_headers(path), headersonly=True)
+    except FileNotFoundError:
+        logger.error('Message file not found: %s', path)
+        return None
+
+
+def parse_patterns(value):
+    """Split comma-separated `value` into a tuple of non-empty patterns."""
+    return tuple(p for p in (s.strip() for s in value.split(',')) if p)
+
+
+def compile_patterns(patterns):
+    """Return a function which checks if a string matches fnmatch `patterns`.
+
+    Patterns of form ``*suffix`` and ``*substring*`` are checked with plain
+    string operations, the rest are compiled into a single regex.  Return
+    None if `patterns` is empty.
+
+    """
+    if not patterns:
+        return None
+
+    suffixes, substrings, others = [], [], []
+    for pattern in patterns:
+        if not pattern.startswith('*'):
+            others.append(pattern)
+        elif not _GLOB_CHARS_RE.search(pattern[1:]):
+            suffixes.append(pattern[1:])
+        elif (len(pattern) > 2 and pattern.endswith('*')
+              and not _GLOB_CHARS_RE.search(pattern[1:-1])):
+            substrings.append(pattern[1:-1])
+        else:
+            others.append(pattern)
+
+    suffixes = tuple(suffixes)
+    regex = None
+    if others:
+        regex = re.compile('|'.join('(?:{})'.format(translate(p))
+                                    for p in others))
+
+    def match(string):
+        return (string.endswith(suffixes)
+                or any(substring in string for substring in substrings)
+                or (regex is not None and regex.match(string) is not None))
+
+    return match
+
+
+def maildir_is_ignored(directory):
+    """Check if `directory` is ignored in the config."""
+    if _ignore_match is None or not _ignore_match(directory):
+        return False
+    return _whitelist_match is None or not _whitelist_match(directory)
 
 
 def should_notify():
@@ -233,6 +496,68 @@ def invoke_action(_notification, name):
     GLib.spawn_command_line_async(command)
 
 
+def is_linked_message(path):
+    """Check if file at `path` is a complete message, not one being written.
+
+    Messages delivered with link(2) already have content, or another link to
+    the same file in the tmp/ directory.  Files which are still being written
+    are empty when created.
+
+    """
+    try:
+        stat = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.st_nlink > 1 or stat.st_size > 0
+
+
+class Inotify:
+    """Minimal wrapper for the Linux inotify API.
+
+    All watches share a single file descriptor, which should be polled for
+    input by the caller.
+
+    """
+
+    _event_header = struct.Struct('iIII')
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._check(
+            self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+
+    @staticmethod
+    def _check(result):
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+    def add_watch(self, path, mask):
+        """Watch `path` for events in `mask`, return watch descriptor."""
+        return self._check(
+            self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask))
+
+    def read_events(self):
+        """Yield (wd, mask, name) tuples for all pending events."""
+        header = self._event_header
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = header.unpack_from(buf, offset)
+                offset += header.size
+                name = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+                yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self.fd)
+
+
 class GNotifier:
     def __init__(self):
         self._notifications = []
@@ -243,30 +568,27 @@ class GNotifier:
 
         summary = '{} new mail {} received'.format(
             len(messages), 'messages' if len(messages) != 1 else 'message')
-        body = ''
+        lines = []
         server_capabilities = Notify.get_server_caps()
+        markup = 'body-markup' in server_capabilities
+        line_format = '<b>{}</b> from <i>{}</i>' if markup else '{} from {}'
 
         for message in messages:
-            if body:
-                body += '\n--\n'
-
-            subject = message['Subject']
-            sender = message['From']
+            subject = decode_header_value(message['Subject'])
+            sender = decode_header_value(message['From'])
 
             logger.info('From %s, Subject: %s', sender, subject)
 
-            if 'body-markup' in server_capabilities:
+            if markup:
                 # Escape the notification body - needed for xfce4-notifyd which
                 # fails to render body markup, because it thinks that
                 # <email@email> is a tag.
                 subject = html.escape(subject)
                 sender = html.escape(sender)
-                subject = '<b>{}</b>'.format(subject)
-                sender = '<i>{}</i>'.format(sender)
-            body += '{} from {}'.format(subject, sender)
+            lines.append(line_format.format(subject, sender))
 
         notification = Notify.Notification.new(summary=summary,
-                                               body=body,
+                                               body='\n--\n'.join(lines),
                                                icon='mail-unread')
 
         if 'actions' in server_capabilities:
@@ -299,17 +621,37 @@ class LogNotifier:
 
 class App:
     def __init__(self):
-        self._queue = []
+        self._queue = {}
+        self._pool = None
+        self._futures = set()
         self._monitors = []
+        self._inotify = None
+        self._inotify_source = None
+        self._watches = {}
         self._notifiers = [LogNotifier(), GNotifier()]
         self._timer = None
+        self._last_reset = 0.0
 
     def stop(self):
-        """Cancel all directory monitors and the timer."""
+        """Cancel all directory monitors, pending parses and the timer."""
+        if self._pool is not None:
+            # Cancel parses which haven't started yet.
+            for future in self._futures:
+                future.cancel()
+            self._futures.clear()
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
         for monitor in self._monitors:
             monitor.cancel()
         self._monitors.clear()
 
+        if self._inotify is not None:
+            GLib.source_remove(self._inotify_source)
+            self._inotify.close()
+            self._inotify = self._inotify_source = None
+            self._watches.clear()
+
         for notifier in self._notifiers:
             notifier.unsubscribe()
 
@@ -320,42 +662,106 @@ class App:
     def start(self):
         """Find maildirs, start watching them."""
         self.stop()
+        self._pool = ThreadPoolExecutor(max_workers=4)
 
         directory = os.path.expanduser(config['global']['maildir'])
-        for maildir in iter_maildirs(directory):
+        maildirs = []
+        for maildir in find_maildirs(directory):
             if maildir_is_ignored(maildir):
                 logger.info('Ignoring maildir %s', maildir)
+            else:
+                maildirs.append(maildir)
+
+        try:
+            self._inotify = Inotify()
+        except (AttributeError, OSError) as exc:
+            logger.info('inotify not available (%s), using GIO monitors', exc)
+            self._start_gio_monitors(maildirs)
+        else:
+            self._start_inotify_watches(maildirs)
+
+    def _start_inotify_watches(self, maildirs):
+        # Messages are either renamed or hard linked into new/, or written
+        # there directly, in which case they're complete once the file is
+        # closed.
+        mask = IN_MOVED_TO | IN_CREATE | IN_CLOSE_WRITE | IN_ONLYDIR
+        for maildir in maildirs:
+            new_msg_dir = maildir + '/new'
+            try:
+                wd = self._inotify.add_watch(new_msg_dir, mask)
+            except OSError as exc:
+                logger.error('Cannot watch maildir %s: %s', maildir, exc)
                 continue
-            new_msg_dir = os.path.join(maildir, 'new')
-            gfile = Gio.File.new_for_path(new_msg_dir)
-            monitor = gfile.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES)
-            self._monitors.append(monitor)
+            self._watches[wd] = new_msg_dir
+
+            logger.info('Watching maildir %s', maildir)
+
+        self._inotify_source = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, self._inotify.fd, GLib.IOCondition.IN,
+            self._handle_inotify_events)
+
+    def _start_gio_monitors(self, maildirs):
+        for maildir in maildirs:
+            gfile = Gio.File.new_for_path(maildir + '/new')
+            # Without WATCH_MOVES, messages renamed into the directory are
+            # reported as CREATED.
+            monitor = gfile.monitor_directory(Gio.FileMonitorFlags.NONE)
             monitor.connect('changed', self._handle_file_event)
+            self._monitors.append(monitor)
 
             logger.info('Watching maildir %s', maildir)
 
+    def _handle_inotify_events(self, _fd, _condition):
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                logger.warning('inotify event queue overflowed')
+            elif mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+            elif wd in self._watches and name and not mask & IN_ISDIR:
+                path = self._watches[wd] + '/' + name
+                logger.debug('Got inotify event file=%s, mask=%#x', path,
+                             mask)
+                if mask & IN_CREATE and not is_linked_message(path):
+                    # The message is being written, IN_CLOSE_WRITE will be
+                    # reported when it's done.
+                    continue
+                self._handle_new_file(path)
+        return GLib.SOURCE_CONTINUE
+
     def _handle_file_event(self, _file_monitor, file, _other_file, event_type):
-        if event_type not in (Gio.FileMonitorEvent.CREATED,
-                              Gio.FileMonitorEvent.MOVED_IN):
+        if event_type not in _HANDLED_EVENTS:
             return
 
         path = file.get_path()
         logger.debug('Got file event file=%s, type=%s', path, event_type)
-
-        try:
-            with open(path) as inputfile:
-                message = email.message_from_file(inputfile,
-                                                  policy=email.policy.SMTP)
-                self._queue.append(message)
-        except FileNotFoundError:
-            logger.error('Message file not found: %s', path)
-            return
-        self._handle_messages()
-
-    def _notify(self, messages):
+        self._handle_new_file(path)
+
+    def _handle_new_file(self, path):
+        # Parse the message in the background and enqueue it from the main
+        # loop when done.
+        future = self._pool.submit(parse_message_file, path)
+        self._futures.add(future)
+        future.add_done_callback(
+            partial(GLib.idle_add, partial(self._enqueue_parsed, self._pool)))
+
+    def _enqueue_parsed(self, pool, future):
+        self._futures.discard(future)
+        if pool is not self._pool:
+            # Parsing finished after the app was stopped.
+            return GLib.SOURCE_REMOVE
+
+        message = future.result()
+        if message is not None:
+            # Duplicate messages replace each other in the queue.
+            self._queue[hash_message(message)] = message
+            self._handle_messages()
+        return GLib.SOURCE_REMOVE
+
+    def _notify(self):
+        messages = list(self._queue.values())
+        self._queue.clear()
         for notifier in self._notifiers:
             notifier.notify(messages)
-        self._queue.clear()
         self._timer = None
 
     def _handle_messages(self):
@@ -363,12 +769,25 @@ class App:
         if not self._queue:
             return True
 
-        # Remove duplicate messages.
-        messages = {hash_message(m): m for m in self._queue}.values()
+        # Don't restart the timer for every message in a burst of deliveries.
+        now = time.monotonic()
+        if (self._timer is not None
+                and now - self._last_reset < TIMER_RESET_INTERVAL):
+            return
+        self._last_reset = now
 
         if self._timer is not None:
             GLib.source_remove(self._timer)
-        self._timer = GLib.timeout_add_seconds(60.0, self._notify, messages)
+        self._timer = GLib.timeout_add_seconds(60.0, self._notify)
+
+
+def unhandled_exception_hook(etype, value, traceback):
+    """Log unhandled exception and stop the GTK event loop."""
+    global _success
+    logger.exception('Unhandled exception, exiting',
+                     exc_info=(etype, value, traceback))
+    Gtk.main_quit()
+    _success = False
 
 
 def main():
@@ -381,7 +800,6 @@ def main():
 
     config_path = os.path.join(os.environ.get('XDG_CONFIG_HOME', '~/.config'),
                                'maildirwatch.conf')
-    argv = Gtk.init(sys.argv)
 
     epilog = (
         'In addition to these arguments, you can also specify GTK options,\n'
@@ -405,7 +823,8 @@ def main():
                         action='version',
                         version='%(prog)s {}'.format(__version__))
 
-    args = parser.parse_args(argv[1:])
+    # GTK options are not known yet, they're validated after GTK is loaded.
+    args, _ = parser.parse_known_args()
 
     if args.debug:
         logger.setLevel(logging.DEBUG)
@@ -414,6 +833,16 @@ def main():
     logger.info('Loading config file %s', user_config_path)
     config.read(user_config_path)
 
+    global _ignore_match, _whitelist_match
+    _ignore_match = compile_patterns(
+        parse_patterns(config['global']['ignore']))
+    _whitelist_match = compile_patterns(
+        parse_patterns(config['global']['whitelist']))
+
+    import_gi()
+    argv = Gtk.init(sys.argv)
+    parser.parse_args(argv[1:])
+
     if not Notify.init('maildir-watch'):
         logger.critical('Could not init Notify')
         sys.exit(1)
@@ -425,20 +854,10 @@ def main():
     app = App()
     app.start()
 
-    success = True
-
     try:
         GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT,
                              Gtk.main_quit)
 
-        def unhandled_exception_hook(etype, value, traceback):
-            logger.exception('Unhandled exception, exiting',
-                             exc_info=(etype, value, traceback))
-            Gtk.main_quit()
-
-            nonlocal success
-            success = False
-
         # Install an unhandled exception handler which stops GTK event loop.
         sys.excepthook = unhandled_exception_hook
 
@@ -448,7 +867,7 @@ def main():
         app.stop()
         Notify.uninit()
 
-    sys.exit(0 if success else 1)
+    sys.exit(0 if _success else 1)
 
 
 if __name__ == "__main__":